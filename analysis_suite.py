@@ -1,10 +1,82 @@
 import argparse
-from saved_search_loader import load_saved_searches
+import itertools
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from best_practices import check_best_practices
 from cim_validation import check_cim_compliance
-from syntax_checker import check_syntax
+from syntax_checker import (
+    check_syntax,
+    connect_splunk,
+    load_saved_searches,
+    positive_int,
+)
 from formatter import format_search
 
+# Searches sent to a worker process per task, amortizing the IPC overhead
+ANALYSIS_CHUNK_SIZE = 32
+
+
+def analyze_search(item):
+    """
+    Run the offline analyses for a single (name, query) saved search.
+    Module-level so that it can be dispatched to a process pool.
+    """
+    name, query = item
+    return name, {
+        "violations": check_best_practices(name, query),
+        "cim_issues": check_cim_compliance(name, query),
+        "formatted_search": format_search(query),
+    }
+
+
+def analyze_searches(items):
+    """
+    Run analyze_search over a chunk of (name, query) saved searches in a
+    single worker task.
+    """
+    return [analyze_search(item) for item in items]
+
+
+def write_next_report(pending):
+    """
+    Wait for the oldest pending search's analyses and syntax check, then
+    write its report.
+    """
+    analyses, offset, syntax = pending.popleft()
+    name, details = analyses.result()[offset]
+    details["syntax"] = syntax.result()
+    sys.stdout.write(format_report(name, details))
+
+
+def format_report(name, details):
+    """
+    Render the report for a single analyzed search as text.
+    """
+    out = [f"\n--- Report for '{name}' ---\n"]
+    if details["violations"]:
+        out.append("Best Practices Violations:\n")
+        for v in details["violations"]:
+            out.append(f"  - {v}\n")
+    else:
+        out.append("No Best Practices Violations.\n")
+
+    if details["cim_issues"]:
+        out.append("CIM Compliance Issues:\n")
+        for c in details["cim_issues"]:
+            out.append(f"  - {c['field']} not normalized to CIM.\n")
+    else:
+        out.append("All fields are CIM compliant.\n")
+
+    if details["syntax"]["status"] == "Correct":
+        out.append("Syntax: Correct\n")
+    else:
+        out.append(f"Syntax: {details['syntax']['error']}\n")
+
+    out.append("\nFormatted Search:\n")
+    out.append(f"{details['formatted_search']}\n")
+    return "".join(out)
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -15,49 +87,54 @@ def main():
     parser.add_argument("--username", required=True, help="Splunk username")
     parser.add_argument("--password", required=True, help="Splunk password")
     parser.add_argument("--app", default="search", help="Splunk app context")
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=16,
+        help="Number of concurrent syntax checks",
+    )
 
     args = parser.parse_args()
 
-    print("Loading saved searches...")
-    searches = load_saved_searches(
-        args.host, args.port, args.username, args.password, app=args.app
+    # One session serves both loading the searches and checking their syntax
+    service = connect_splunk(
+        {
+            "host": args.host,
+            "port": args.port,
+            "username": args.username,
+            "password": args.password,
+        },
+        app=args.app,
     )
 
-    report = {}
-
-    for name, query in searches.items():
-        print(f"Analyzing search: {name}")
-        report[name] = {
-            "violations": check_best_practices(name, query),
-            "cim_issues": check_cim_compliance(query),
-            "syntax": check_syntax(query),
-            "formatted_search": format_search(query),
-        }
-
-    # Output the report
-    for name, details in report.items():
-        print(f"\n--- Report for '{name}' ---")
-        if details["violations"]:
-            print("Best Practices Violations:")
-            for v in details["violations"]:
-                print(f"  - {v}")
-        else:
-            print("No Best Practices Violations.")
-
-        if details["cim_issues"]:
-            print("CIM Compliance Issues:")
-            for c in details["cim_issues"]:
-                print(f"  - {c} not normalized to CIM.")
-        else:
-            print("All fields are CIM compliant.")
-
-        if details["syntax"] is True:
-            print("Syntax: Correct")
-        else:
-            print(f"Syntax: {details['syntax']}")
-
-        print("\nFormatted Search:")
-        print(details["formatted_search"])
+    print("Loading saved searches...")
+    searches = load_saved_searches(service, app=args.app)
+
+    # Syntax checks are I/O-bound and run on threads sharing one service, while
+    # the CPU-bound analyses run in chunks in a process pool at the same time.
+    # A sliding window bounds the searches in flight: once it is full, the
+    # oldest search's report is written before the next search is submitted.
+    # The first chunk is submitted before any syntax check, so the worker
+    # processes are started before any thread exists.
+    max_pending = max(2 * args.workers, 4 * ANALYSIS_CHUNK_SIZE)
+    pending = deque()
+    items = iter(searches.items())
+    print(f"Analyzing {len(searches)} searches...")
+    with ProcessPoolExecutor() as processes, ThreadPoolExecutor(
+        max_workers=args.workers
+    ) as threads:
+        while True:
+            chunk = list(itertools.islice(items, ANALYSIS_CHUNK_SIZE))
+            if not chunk:
+                break
+            analyses = processes.submit(analyze_searches, chunk)
+            for offset, (name, query) in enumerate(chunk):
+                if len(pending) >= max_pending:
+                    write_next_report(pending)
+                syntax = threads.submit(check_syntax, service, query)
+                pending.append((analyses, offset, syntax))
+        while pending:
+            write_next_report(pending)
 
 
 if __name__ == "__main__":
@@ -1,39 +1,42 @@
 import re
+from functools import lru_cache
+from text_utils import fold_case
 
-# Define regular expressions and patterns for various best practices
+# Define regular expressions and patterns for various best practices.
+# Queries are lowercased once with fold_case before matching, so the patterns
+# are written in lowercase and compiled without re.IGNORECASE.
 BEST_PRACTICES = {
     "no_leading_wildcard": {
         "pattern": re.compile(r"[^\\]\*\w+"),
         "description": "Avoid using wildcards (*) at the beginning of search terms.",
     },
     "explicit_index": {
-        "pattern": re.compile(r"\|?\s*search\s+(?!index=)\w+="),
+        "pattern": re.compile(r"index="),
         "description": "Specify the index explicitly in your search to improve performance.",
     },
     "early_time_range": {
-        "pattern": re.compile(
-            r"^(?!.*time\=).+"
-        ),  # Checks if time range is not specified early
+        # Typically, time range is specified using earliest= and latest= in the search
+        "pattern": re.compile(r"earliest\s*=\s*|latest\s*=\s*"),
         "description": "Specify the time range early in your search to limit data processing.",
     },
     "limit_field_selection": {
-        "pattern": re.compile(r"\bselect\s+\*", re.IGNORECASE),
+        "pattern": re.compile(r"\bselect\s+\*"),
         "description": "Avoid using '*' to select all fields; specify only the necessary fields.",
     },
     "optimize_join_usage": {
-        "pattern": re.compile(r"\bjoin\b\s+\[.*\]", re.IGNORECASE),
+        "pattern": re.compile(r"\bjoin\b\s+\[[^\]\n]*\]"),
         "description": "Evaluate if 'join' is necessary; consider using 'lookup' or other commands for better performance.",
     },
     "prefer_tstats": {
-        "pattern": re.compile(r"\bstats\b", re.IGNORECASE),
+        "pattern": re.compile(r"\bstats\b"),
         "description": "Consider using 'tstats' instead of 'stats' for faster statistical operations when applicable.",
     },
     "avoid_unnecessary_commands": {
-        "pattern": re.compile(r"\| where 1=1|\| search .*", re.IGNORECASE),
+        "pattern": re.compile(r"\| where 1=1|\| search "),
         "description": "Remove unnecessary commands that do not affect the search results.",
     },
     "use_lookups_over_subsearches": {
-        "pattern": re.compile(r"\[.*?\]", re.IGNORECASE),
+        "pattern": re.compile(r"\[[^\]\n]*\]"),
         "description": "Replace subsearches with lookup tables where possible to enhance performance.",
     },
     "efficient_regex_usage": {
@@ -41,173 +44,122 @@ BEST_PRACTICES = {
         "description": "Ensure regular expressions are efficient and not overly complex to avoid performance issues.",
     },
     "leverage_macros_saved_searches": {
-        "pattern": re.compile(r"`[a-zA-Z0-9_]+`"),
+        "pattern": re.compile(r"`[a-z0-9_]+`"),
         "description": "Use macros or saved searches to reuse common search patterns and improve maintainability.",
     },
 }
 
 
-def check_no_leading_wildcard(search_query):
-    """
-    Check for leading wildcards in search terms.
-    """
-    violations = []
-    pattern = BEST_PRACTICES["no_leading_wildcard"]["pattern"]
-    matches = pattern.findall(search_query)
-    for match in matches:
-        if match.startswith("*"):
-            violations.append(BEST_PRACTICES["no_leading_wildcard"]["description"])
-    return violations
-
-
-def check_explicit_index(search_query):
-    """
-    Ensure that the index is specified explicitly in the search.
-    """
-    violations = []
-    pattern = BEST_PRACTICES["explicit_index"]["pattern"]
-    if not re.search(r"index=", search_query, re.IGNORECASE):
-        violations.append(BEST_PRACTICES["explicit_index"]["description"])
-    return violations
-
-
-def check_early_time_range(search_query):
-    """
-    Ensure that the time range is specified early in the search.
-    """
-    violations = []
-    # Typically, time range is specified using earliest= and latest= in the search
-    # This check ensures that time range modifiers are present
-    if not re.search(r"earliest\s*=\s*|latest\s*=\s*", search_query, re.IGNORECASE):
-        violations.append(BEST_PRACTICES["early_time_range"]["description"])
-    return violations
-
-
-def check_limit_field_selection(search_query):
-    """
-    Ensure that field selection is limited to necessary fields.
-    """
-    violations = []
-    pattern = BEST_PRACTICES["limit_field_selection"]["pattern"]
-    if re.search(pattern, search_query):
-        violations.append(BEST_PRACTICES["limit_field_selection"]["description"])
-    return violations
-
-
-def check_optimize_join_usage(search_query):
-    """
-    Check for the use of 'join' and suggest alternatives.
-    """
-    violations = []
-    pattern = BEST_PRACTICES["optimize_join_usage"]["pattern"]
-    if re.search(pattern, search_query):
-        violations.append(BEST_PRACTICES["optimize_join_usage"]["description"])
-    return violations
-
-
-def check_prefer_tstats(search_query):
-    """
-    Suggest using 'tstats' over 'stats' where applicable.
-    """
-    violations = []
-    # This is a heuristic; ideally, you would parse the search to determine if tstats is applicable
-    pattern = BEST_PRACTICES["prefer_tstats"]["pattern"]
-    if re.search(pattern, search_query):
-        violations.append(BEST_PRACTICES["prefer_tstats"]["description"])
-    return violations
-
-
-def check_avoid_unnecessary_commands(search_query):
-    """
-    Identify and flag unnecessary commands in the search pipeline.
-    """
-    violations = []
-    pattern = BEST_PRACTICES["avoid_unnecessary_commands"]["pattern"]
-    matches = pattern.findall(search_query)
-    for match in matches:
-        violations.append(BEST_PRACTICES["avoid_unnecessary_commands"]["description"])
-    return violations
-
-
-def check_use_lookups_over_subsearches(search_query):
-    """
-    Encourage the use of lookups instead of subsearches.
-    """
-    violations = []
-    pattern = BEST_PRACTICES["use_lookups_over_subsearches"]["pattern"]
-    matches = pattern.findall(search_query)
-    for match in matches:
-        violations.append(BEST_PRACTICES["use_lookups_over_subsearches"]["description"])
-    return violations
-
+# Rules detected by their presence in the query. explicit_index,
+# early_time_range and leverage_macros_saved_searches are violated by an
+# *absence* and are checked separately.
+# no_leading_wildcard is listed last so that, at a position where several
+# rules could match, the more specific rules take precedence.
+SCANNED_RULES = (
+    "limit_field_selection",
+    "optimize_join_usage",
+    "prefer_tstats",
+    "avoid_unnecessary_commands",
+    "use_lookups_over_subsearches",
+    "efficient_regex_usage",
+    "no_leading_wildcard",
+)
+
+
+# Lowercase literals, one of which must occur in the query for a scanned rule
+# to match. These are checked with plain substring search so that only the
+# rules that can possibly match are handed to the regex engine.
+RULE_ANCHORS = {
+    "limit_field_selection": ("select",),
+    "optimize_join_usage": ("join",),
+    "prefer_tstats": ("stats",),
+    "avoid_unnecessary_commands": ("| search ",),
+    "use_lookups_over_subsearches": ("[",),
+    "efficient_regex_usage": ("regex",),
+    "no_leading_wildcard": ("**",),
+}
 
-def check_efficient_regex_usage(search_query):
-    """
-    Ensure that regular expressions used in the search are efficient.
-    """
-    violations = []
-    pattern = BEST_PRACTICES["efficient_regex_usage"]["pattern"]
-    matches = pattern.findall(search_query)
-    for match in matches:
-        # Simple check to warn about regex usage; more complex analysis can be implemented
-        if len(match) > 100:  # Arbitrary length to flag potentially complex regex
-            violations.append(BEST_PRACTICES["efficient_regex_usage"]["description"])
-    return violations
+# Lowercase literals that are a violation on their own, without a regex check
+SUFFICIENT_ANCHORS = {
+    "| where 1=1": "avoid_unnecessary_commands",
+}
 
 
-def check_leverage_macros_saved_searches(search_query):
-    """
-    Suggest using macros or saved searches for common patterns.
-    """
-    violations = []
-    pattern = BEST_PRACTICES["leverage_macros_saved_searches"]["pattern"]
-    matches = pattern.findall(search_query)
-    for match in matches:
-        # If macros are used, it's a good practice; if not, suggest their use
-        # This simplistic check assumes that presence of macros is good
-        # You might want to invert this logic based on your organization's practices
-        if not matches:
-            violations.append(
-                BEST_PRACTICES["leverage_macros_saved_searches"]["description"]
-            )
-    return violations
+@lru_cache(maxsize=None)
+def _compile_scan(rules):
+    """
+    Combine the given presence rules into a single pattern so the query is
+    scanned once. Each rule is wrapped in a lookahead so that a match for one
+    rule does not consume text another rule could match.
+    """
+    return re.compile(
+        "|".join(
+            f"(?=(?P<{rule}>{BEST_PRACTICES[rule]['pattern'].pattern}))"
+            for rule in SCANNED_RULES
+            if rule in rules
+        )
+    )
+
+
+@lru_cache(maxsize=4096)
+def _check_best_practices_cached(search_query):
+    """
+    Check a search query against the best practices, cached per query string.
+    Returns a tuple of violated practice descriptions.
+    """
+    lowered = fold_case(search_query)
+    found = {
+        rule for anchor, rule in SUFFICIENT_ANCHORS.items() if anchor in lowered
+    }
+    candidates = frozenset(
+        rule
+        for rule, anchors in RULE_ANCHORS.items()
+        if rule not in found and any(anchor in lowered for anchor in anchors)
+    )
+
+    # Each rule is reported once, so it is dropped from the scan as soon as it
+    # is found. The scan then resumes at that match for the remaining rules;
+    # nothing before it can match, as every rule was already tried there.
+    pending = candidates
+    pos = 0
+    while pending:
+        match = _compile_scan(pending).search(lowered, pos)
+        if match is None:
+            break
+        rule = match.lastgroup
+        text = match.group(rule)
+        if (rule == "no_leading_wildcard" and not text.startswith("*")) or (
+            # Arbitrary length to flag potentially complex regex
+            rule == "efficient_regex_usage" and len(text) <= 100
+        ):
+            pos = match.start() + 1
+            continue
+        found.add(rule)
+        pending = pending - {rule}
+        pos = match.start()
+
+    # Ensure that the index is specified explicitly in the search
+    if not BEST_PRACTICES["explicit_index"]["pattern"].search(lowered):
+        found.add("explicit_index")
+
+    # Ensure that time range modifiers are present
+    if not BEST_PRACTICES["early_time_range"]["pattern"].search(lowered):
+        found.add("early_time_range")
+
+    # Suggest macros or saved searches when the search uses none
+    if not BEST_PRACTICES["leverage_macros_saved_searches"]["pattern"].search(lowered):
+        found.add("leverage_macros_saved_searches")
+
+    return tuple(
+        practice["description"]
+        for rule, practice in BEST_PRACTICES.items()
+        if rule in found
+    )
 
 
 def check_best_practices(search_name, search_query):
     """
     Check if the search adheres to Splunk best practices.
-    Returns a list of violated practices.
+    Returns a list of violated practices, each reported once.
     """
-    violations = []
-
-    # Check for leading wildcards
-    violations += check_no_leading_wildcard(search_query)
-
-    # Check for explicit index specification
-    violations += check_explicit_index(search_query)
-
-    # Check for early time range specification
-    violations += check_early_time_range(search_query)
-
-    # Check for limiting field selection
-    violations += check_limit_field_selection(search_query)
-
-    # Check for optimizing join usage
-    violations += check_optimize_join_usage(search_query)
-
-    # Check if 'tstats' can be used instead of 'stats'
-    violations += check_prefer_tstats(search_query)
-
-    # Check for unnecessary commands
-    violations += check_avoid_unnecessary_commands(search_query)
-
-    # Check for use of lookups over subsearches
-    violations += check_use_lookups_over_subsearches(search_query)
-
-    # Check for efficient regex usage
-    violations += check_efficient_regex_usage(search_query)
-
-    # Check for leveraging macros or saved searches
-    violations += check_leverage_macros_saved_searches(search_query)
-
-    return violations
+    return list(_check_best_practices_cached(search_query))
@@ -1,5 +1,8 @@
 import re
+from types import MappingProxyType
 from collections import defaultdict
+from functools import lru_cache
+from text_utils import fold_case
 
 # Define CIM-compliant fields for various data sources
 CIM_FIELD_MAPPINGS = {
@@ -66,23 +69,46 @@ CIM_FIELD_MAPPINGS = {
 ALL_CIM_FIELDS = set()
 for source_fields in CIM_FIELD_MAPPINGS.values():
     ALL_CIM_FIELDS.update(source_fields.values())
+ALL_CIM_FIELDS_LOWER = frozenset(field.lower() for field in ALL_CIM_FIELDS)
 
-# Patterns to identify commands and their arguments
+# Lowercased fields accepted as CIM-compliant: the CIM fields themselves plus
+# the source-specific fields that map onto them. Mapping a field properly
+# requires knowing the data source; for simplicity, we accept all mappings.
+_CIM_ACCEPT = ALL_CIM_FIELDS_LOWER | frozenset(
+    field.lower() for mappings in CIM_FIELD_MAPPINGS.values() for field in mappings
+)
+
+# Patterns to identify commands and their arguments. Commands are lowercased
+# once with fold_case before matching, so the patterns are case-sensitive.
 COMMAND_PATTERNS = {
-    "rename": re.compile(r'rename\s+(.*?)\s+as\s+(.*?)($|\s|$)', re.IGNORECASE),
-    "eval": re.compile(r'eval\s+(.*?)\s*=', re.IGNORECASE),
-    "stats": re.compile(r'stats\s+(.*?)\s+by\s+(.*)', re.IGNORECASE),
-    "lookup": re.compile(r'lookup\s+(.*?)\s+(.*?)\s+OUTPUT(?:NEW)?\s+(.*)', re.IGNORECASE),
+    "rename": re.compile(r'rename\s+(.*?)\s+as\s+(\S+)'),
+    "eval": re.compile(r'eval\s+(.*?)\s*='),
+    "stats": re.compile(r'stats\s+(.*?)\s+by\s+(.*)'),
+    "lookup": re.compile(r'lookup\s+(.*?)\s+(.*?)\s+output(?:new)?\s+(.*)'),
 }
 
+# Patterns used while harvesting fields from individual commands
+CMD_TYPE_RE = re.compile(r'(\w+)')
+AGG_RE = re.compile(r'\s*\w+\((.*?)\)\s*as\s*(\w+)')
+AGG_INNER_RE = re.compile(r'\w+\((.*?)\)')
+FIELD_EQ_RE = re.compile(r'\b(\w+)=')
+WORD_RE = re.compile(r'\b(\w+)\b')
+
+def _groups(match, text):
+    """
+    Return the groups of a match made on folded text, in their original casing.
+    """
+    # Unmatched groups span (-1, -1), which slices to an empty string
+    return tuple(text[slice(*match.span(group))] for group in range(1, match.re.groups + 1))
+
 def extract_fields_from_rename(command):
     """
     Extract fields being renamed.
     """
+    folded = fold_case(command)
     fields = []
-    matches = COMMAND_PATTERNS["rename"].findall(command)
-    for match in matches:
-        old_field, new_field, _ = match
+    for match in COMMAND_PATTERNS["rename"].finditer(folded):
+        old_field, new_field = _groups(match, command)
         fields.append((old_field.strip(), new_field.strip()))
     return fields
 
@@ -90,32 +116,33 @@ def extract_fields_from_eval(command):
     """
     Extract fields being created or modified in eval.
     """
+    folded = fold_case(command)
     fields = []
-    matches = COMMAND_PATTERNS["eval"].findall(command)
-    for match in matches:
-        field = match.strip()
-        fields.append(field)
+    for match in COMMAND_PATTERNS["eval"].finditer(folded):
+        field = _groups(match, command)[0]
+        fields.append(field.strip())
     return fields
 
 def extract_fields_from_stats(command):
     """
     Extract fields used in stats commands.
     """
+    folded = fold_case(command)
     fields = []
-    matches = COMMAND_PATTERNS["stats"].findall(command)
-    for match in matches:
-        agg_fields, by_fields = match
+    for match in COMMAND_PATTERNS["stats"].finditer(folded):
+        agg_fields, by_fields = _groups(match, command)
         # Extract aggregation fields
         agg_parts = agg_fields.split(',')
         for part in agg_parts:
             # Handle possible aliases in aggregation
-            agg_match = re.match(r'\s*\w+\((.*?)\)\s*as\s*(\w+)', part.strip(), re.IGNORECASE)
+            part_stripped = part.strip()
+            agg_match = AGG_RE.match(fold_case(part_stripped))
             if agg_match:
-                _, alias = agg_match.groups()
+                _, alias = _groups(agg_match, part_stripped)
                 fields.append(alias.strip())
             else:
                 # If no alias, extract the field inside the aggregation
-                agg_inner = re.findall(r'\w+\((.*?)\)', part)
+                agg_inner = AGG_INNER_RE.findall(part)
                 if agg_inner:
                     fields.append(agg_inner[0].strip())
         # Extract by fields
@@ -129,67 +156,80 @@ def extract_fields_from_lookup(command):
     """
     Extract fields used and created in lookup commands.
     """
+    folded = fold_case(command)
     fields = []
-    matches = COMMAND_PATTERNS["lookup"].findall(command)
-    for match in matches:
-        lookup_table, input_fields, output_fields = match
+    for match in COMMAND_PATTERNS["lookup"].finditer(folded):
+        lookup_table, input_fields, output_fields = _groups(match, command)
         input_fields = [f.strip() for f in input_fields.split(',')]
         output_fields = [f.strip() for f in output_fields.split(',')]
         fields.extend(input_fields + output_fields)
     return fields
 
+# Commands that use fields but do not create them
+FIELD_USING_COMMANDS = frozenset(['search', 'where', 'table', 'fields', 'fillnull', 'coalesce'])
+
+# Every command parse_search_query extracts fields from; a query mentioning
+# none of them cannot have any fields to check
+_CIM_TRIGGERS = ('rename', 'eval', 'stats', 'lookup', *sorted(FIELD_USING_COMMANDS))
+
+@lru_cache(maxsize=4096)
 def parse_search_query(search_query):
     """
     Parse the search query and extract all fields used or created via specific commands.
+    Results are cached per query string and shared between callers, so the
+    returned mapping and its field sets are read-only.
     """
     # Split the search query into individual commands based on '|'
     commands = [cmd.strip() for cmd in search_query.split('|') if cmd.strip()]
     
-    # Initialize a dictionary to hold fields categorized by their usage
-    fields_usage = defaultdict(set)
+    # Initialize a dictionary to hold fields categorized by their usage; fields
+    # are collected in lists and deduplicated once at the end
+    fields_usage = {'renamed': [], 'created': [], 'used': []}
     
     for cmd in commands:
         # Identify the command type
-        cmd_type_match = re.match(r'(\w+)', cmd)
+        cmd_type_match = CMD_TYPE_RE.match(cmd)
         if not cmd_type_match:
             continue
-        cmd_type = cmd_type_match.group(1).lower()
+        cmd_type = fold_case(cmd_type_match.group(1))
         
         if cmd_type == 'rename':
             renamed_fields = extract_fields_from_rename(cmd)
-            for old, new in renamed_fields:
-                fields_usage['renamed'].add(new)
+            fields_usage['renamed'].extend(new for old, new in renamed_fields)
         elif cmd_type == 'eval':
             eval_fields = extract_fields_from_eval(cmd)
-            for field in eval_fields:
-                fields_usage['created'].add(field)
+            fields_usage['created'].extend(eval_fields)
         elif cmd_type == 'stats':
             stats_fields = extract_fields_from_stats(cmd)
-            for field in stats_fields:
-                fields_usage['used'].add(field)
+            fields_usage['used'].extend(stats_fields)
         elif cmd_type == 'lookup':
             lookup_fields = extract_fields_from_lookup(cmd)
-            for field in lookup_fields:
-                fields_usage['used'].add(field)
-        elif cmd_type in ['search', 'where', 'table', 'fields', 'fillnull', 'coalesce']:
-            # These commands use fields but do not create them
-            # Extract fields using regex to find field names
-            used_fields = re.findall(r'\b(\w+)=', cmd)
+            fields_usage['used'].extend(lookup_fields)
+        elif cmd_type in FIELD_USING_COMMANDS:
+            # Extract fields using regex to find field names; without an '='
+            # in the command there is nothing for the first pattern to find
+            used_fields = FIELD_EQ_RE.findall(cmd) if '=' in cmd else []
             if not used_fields:
                 # Alternative pattern to capture fields without '='
-                used_fields = re.findall(r'\b(\w+)\b', cmd)
-            for field in used_fields:
-                fields_usage['used'].add(field)
+                used_fields = WORD_RE.findall(cmd)
+            fields_usage['used'].extend(used_fields)
         # Add more command types as needed
     
-    return fields_usage
+    return MappingProxyType(
+        {usage: frozenset(fields) for usage, fields in fields_usage.items()}
+    )
 
-def check_cim_compliance(search_name, search_query):
+@lru_cache(maxsize=4096)
+def _check_cim_compliance_cached(search_query):
     """
-    Check if the search adheres to CIM normalization.
-    Returns a list of non-compliant fields with details.
+    Return the fields of a search query that are not CIM-compliant, cached per
+    query string.
     """
-    violations = []
+    folded = fold_case(search_query)
+    if not any(trigger in folded for trigger in _CIM_TRIGGERS):
+        return ()
+    
+    non_compliant = []
     fields_usage = parse_search_query(search_query)
     
     # Combine all fields used and created
@@ -199,22 +239,24 @@ def check_cim_compliance(search_name, search_query):
     
     # Check each field for CIM compliance
     for field in all_fields:
-        if field not in ALL_CIM_FIELDS:
-            # Attempt to find if the field can be mapped via source-specific mappings
-            # This requires knowing the data source; for simplicity, we check all mappings
-            mapped = False
-            for source, mappings in CIM_FIELD_MAPPINGS.items():
-                if field in mappings:
-                    mapped = True
-                    break
-            if not mapped:
-                violations.append({
-                    "field": field,
-                    "issue": "Field is not CIM-compliant.",
-                    "suggestion": "Map the field to a CIM-compliant field or use field aliases to conform to CIM."
-                })
+        if field.lower() not in _CIM_ACCEPT:
+            non_compliant.append(field)
     
-    return violations
+    return tuple(non_compliant)
+
+def check_cim_compliance(search_name, search_query):
+    """
+    Check if the search adheres to CIM normalization.
+    Returns a list of non-compliant fields with details.
+    """
+    return [
+        {
+            "field": field,
+            "issue": "Field is not CIM-compliant.",
+            "suggestion": "Map the field to a CIM-compliant field or use field aliases to conform to CIM."
+        }
+        for field in _check_cim_compliance_cached(search_query)
+    ]
 
 def get_field_aliases():
     """
@@ -227,16 +269,19 @@ def get_field_aliases():
             aliases[cim_field].append(custom_field)
     return aliases
 
+# Reverse index from lowercased source-specific fields to their CIM fields
+_ALIAS_BY_LOWER_CUSTOM = {}
+for cim_field, custom_fields in get_field_aliases().items():
+    for custom_field in custom_fields:
+        suggestions = _ALIAS_BY_LOWER_CUSTOM.setdefault(custom_field.lower(), [])
+        if cim_field not in suggestions:
+            suggestions.append(cim_field)
+
 def suggest_alias(field):
     """
     Suggest possible CIM-compliant aliases for a non-compliant field.
     """
-    aliases = get_field_aliases()
-    suggestions = []
-    for cim_field, custom_fields in aliases.items():
-        if field.lower() in [cf.lower() for cf in custom_fields]:
-            suggestions.append(cim_field)
-    return suggestions
+    return list(_ALIAS_BY_LOWER_CUSTOM.get(field.lower(), ()))
 
 if __name__ == "__main__":
     # Example usage
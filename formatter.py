@@ -1,15 +1,7 @@
-from pyparsing import (
-    Word,
-    alphas,
-    alphanums,
-    Group,
-    oneOf,
-    ZeroOrMore,
-    Optional,
-    restOfLine,
-    Suppress,
-    Keyword,
-)
+import re
+
+# A pipe together with the whitespace surrounding it
+PIPE_RE = re.compile(r"\s*\|\s*")
 
 
 def format_search(search_query):
@@ -17,9 +9,5 @@ def format_search(search_query):
     Format the Splunk search query to be well laid out and easy to read.
     This is a simplistic formatter. For more advanced formatting, consider using a proper parser.
     """
-    # Simple indentation based on pipe '|'
-    lines = search_query.split("|")
-    formatted_lines = [lines[0].strip()]
-    for line in lines[1:]:
-        formatted_lines.append("  | " + line.strip())
-    return "\n".join(formatted_lines)
+    # Simple indentation based on pipe '|', in a single substitution pass
+    return PIPE_RE.sub("\n  | ", search_query.strip())
@@ -2,10 +2,11 @@ import os
 import sys
 import argparse
 import getpass
+import json
 import splunklib.client as client
-import splunklib.results as results
 from splunklib.binding import HTTPError
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List
 
 # Configure logging
@@ -16,6 +17,18 @@ logging.basicConfig(
     level=logging.INFO
 )
 
+def positive_int(value: str) -> int:
+    """
+    Argparse type for options that must be a whole number of at least 1.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
 def get_credentials(args) -> Dict[str, Any]:
     """
     Retrieve Splunk credentials from environment variables or prompt the user.
@@ -69,7 +82,8 @@ def load_saved_searches(service: client.Service, app: str = 'search') -> Dict[st
     Retrieve saved searches from the specified Splunk app.
     """
     try:
-        saved_searches = service.saved_searches.list()
+        # Fetch every saved search in one request, returning only the search string
+        saved_searches = service.saved_searches.list(count=-1, f=['search'])
         searches = {}
         for search in saved_searches:
             if search.name.startswith('_'):  # Skip internal searches
@@ -83,32 +97,19 @@ def load_saved_searches(service: client.Service, app: str = 'search') -> Dict[st
 
 def check_syntax(service: client.Service, search_query: str) -> Dict[str, Any]:
     """
-    Check the syntax of a Splunk search query using parse_only=1.
+    Check the syntax of a Splunk search query against the search/parser endpoint.
+    Parsing does not dispatch a search job, so this is safe to call concurrently.
     Returns a dictionary with the status and any error messages.
     """
     try:
-        kwargs = {
-            "exec_mode": "blocking",
-            "parse_only": "1",
-            "earliest_time": "0",
-            "latest_time": "now"
-        }
-        job = service.jobs.create(search_query, **kwargs)
-        # If the job completes without errors, syntax is correct
-        if job["dispatchState"] == "DONE":
-            logging.info("Syntax is correct.")
-            return {"status": "Correct", "error": None}
-        else:
-            # Retrieve results to find any errors
-            reader = results.ResultsReader(job.results())
-            for result in reader:
-                if isinstance(result, dict) and 'ERROR' in result:
-                    error_message = result.get('ERROR')
-                    logging.warning(f"Syntax error: {error_message}")
-                    return {"status": "Error", "error": error_message}
-            logging.info("Syntax is correct.")
-            return {"status": "Correct", "error": None}
+        service.get('search/parser', q=search_query, parse_only="1")
+        logging.info("Syntax is correct.")
+        return {"status": "Correct", "error": None}
     except HTTPError as e:
+        if e.status == 400:
+            # The parser rejects invalid searches with a 400 carrying the error
+            logging.warning(f"Syntax error: {e}")
+            return {"status": "Error", "error": str(e)}
         error_msg = f"HTTPError during syntax check: {e}"
         logging.error(error_msg)
         return {"status": "Error", "error": error_msg}
@@ -124,8 +125,12 @@ def main():
     parser.add_argument('--username', help='Splunk username')
     parser.add_argument('--password', help='Splunk password')
     parser.add_argument('--app', default='search', help='Splunk app context (default: search)')
-    parser.add_argument('--output', default='syntax_report.txt', help='Output report file (default: syntax_report.txt)')
+    parser.add_argument('--output', help='Output report file (default: syntax_report.txt, or syntax_report.json with --format json)')
+    parser.add_argument('--format', choices=['text', 'json'], default='text', help='Report format (default: text)')
+    parser.add_argument('--workers', type=positive_int, default=16, help='Number of concurrent syntax checks (default: 16)')
     args = parser.parse_args()
+    if args.output is None:
+        args.output = 'syntax_report.json' if args.format == 'json' else 'syntax_report.txt'
 
     # Retrieve credentials
     credentials = get_credentials(args)
@@ -136,26 +141,33 @@ def main():
     # Load saved searches
     saved_searches = load_saved_searches(service, app=args.app)
 
-    # Initialize report data structure
-    report = {}
-
-    # Iterate over saved searches and check syntax
-    for name, query in saved_searches.items():
-        logging.info(f"Checking syntax for saved search: {name}")
-        syntax_result = check_syntax(service, query)
-        report[name] = syntax_result
+    # Check syntax of all saved searches concurrently, sharing one service
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {}
+        for name, query in saved_searches.items():
+            logging.info(f"Checking syntax for saved search: {name}")
+            futures[name] = executor.submit(check_syntax, service, query)
+        report = {name: future.result() for name, future in futures.items()}
 
     # Write report to file
     try:
-        with open(args.output, 'w') as f:
-            f.write("Splunk Saved Searches Syntax Report\n")
-            f.write("===================================\n\n")
+        if args.format == 'json':
+            # Serialize the whole report in a single call
+            contents = json.dumps(report, indent=2)
+        else:
+            buf = [
+                "Splunk Saved Searches Syntax Report\n",
+                "===================================\n\n",
+            ]
             for name, result in report.items():
-                f.write(f"Search Name: {name}\n")
-                f.write(f"Status: {result['status']}\n")
+                buf.append(f"Search Name: {name}\n")
+                buf.append(f"Status: {result['status']}\n")
                 if result['error']:
-                    f.write(f"Error: {result['error']}\n")
-                f.write("\n")
+                    buf.append(f"Error: {result['error']}\n")
+                buf.append("\n")
+            contents = "".join(buf)
+        with open(args.output, 'w') as f:
+            f.write(contents)
         logging.info(f"Syntax report written to {args.output}")
         print(f"Syntax report successfully written to {args.output}")
     except Exception as e:
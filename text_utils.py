@@ -0,0 +1,13 @@
+import string
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+def fold_case(text):
+    """
+    Lowercase text for matching against the case-sensitive patterns.
+    Non-ASCII text only has its ASCII letters folded, so that offsets into the
+    result always line up with the original text.
+    """
+    if text.isascii():
+        return text.lower()
+    return text.translate(_ASCII_LOWER)